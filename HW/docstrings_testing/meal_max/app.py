@@ -4,7 +4,12 @@ from flask import Flask, jsonify, make_response, Response, request
 
 from meal_max.models import kitchen_model
 from meal_max.models.battle_model import BattleModel
-from meal_max.utils.sql_utils import check_database_connection, check_table_exists
+from meal_max.utils.sql_utils import (
+    check_database_connection,
+    check_table_exists,
+    close_db_connection,
+    migrate_meals_table
+)
 
 
 # Load environment variables from .env file
@@ -16,9 +21,19 @@ app = Flask(__name__)
 # uncomment this
 # CORS(app)
 
+# Bring a database created by an older schema up to date without losing its data
+migrate_meals_table()
+
 # Initialize the BattleModel
 battle_model = BattleModel()
 
+
+@app.teardown_appcontext
+def teardown_db_connection(exception) -> None:
+    # The request's thread ends with the request, so close its connection
+    # now instead of leaving it for the garbage collector.
+    close_db_connection()
+
 ####################################################
 #
 # Healthchecks
@@ -290,17 +305,28 @@ def get_leaderboard() -> Response:
 
     Query Parameters:
         - sort (str): The field to sort by ('wins', 'battles', or 'win_pct'). Default is 'wins'.
+        - limit (int, optional): Only return the top N meals. Default is all of them.
 
     Returns:
         JSON response with a sorted leaderboard of meals.
     Raises:
+        400 error if limit is not a non-negative integer.
         500 error if there is an issue generating the leaderboard.
     """
     try:
         sort_by = request.args.get('sort', 'wins')  # Default sort by wins
+        limit = request.args.get('limit')  # None means the whole leaderboard
+        if limit is not None:
+            try:
+                limit = int(limit)
+                if limit < 0:
+                    raise ValueError("limit is negative")
+            except ValueError:
+                return make_response(jsonify({'error': 'limit must be a non-negative integer'}), 400)
         app.logger.info("Generating leaderboard sorted by %s", sort_by)
 
-        leaderboard_data = kitchen_model.get_leaderboard(sort_by)
+        # the limit is applied in SQL, so only the requested top N are read
+        leaderboard_data = kitchen_model.get_leaderboard(sort_by, limit)
 
         return make_response(jsonify({'status': 'success', 'leaderboard': leaderboard_data}), 200)
     except Exception as e:
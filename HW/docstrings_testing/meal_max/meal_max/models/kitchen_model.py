@@ -1,9 +1,11 @@
+from collections import OrderedDict
 from dataclasses import dataclass
 import logging
 import sqlite3
-from typing import Any
+import threading
+from typing import Any, Iterable, List, Optional, Tuple
 
-from meal_max.utils.sql_utils import get_db_connection
+from meal_max.utils.sql_utils import get_db_connection, get_readonly_connection
 from meal_max.utils.logger import configure_logger
 
 
@@ -11,8 +13,73 @@ logger = logging.getLogger(__name__)
 configure_logger(logger)
 
 
-@dataclass
+# SQL is kept in module constants so every call submits the identical string
+# and hits the connection's prepared statement cache instead of re-parsing.
+# Duplicate names are reported through the (missing) returned row rather than
+# an IntegrityError. The NOT EXISTS guard produces no row at all for a taken
+# name, so unlike ON CONFLICT DO NOTHING it never advances the AUTOINCREMENT
+# sequence and rejected duplicates leave no gaps in the ids.
+_SQL_INSERT_MEALS = """
+    INSERT INTO meals (meal, cuisine, price, difficulty)
+    SELECT ?1, ?2, ?3, ?4 WHERE NOT EXISTS (SELECT 1 FROM meals WHERE meal = ?1)
+"""
+_SQL_INSERT_MEAL = _SQL_INSERT_MEALS + " RETURNING id"
+_SQL_MEAL_EXISTS = "SELECT 1 FROM meals WHERE id = ?"
+_SQL_MEAL_NAME_EXISTS = "SELECT 1 FROM meals WHERE meal = ?"
+_SQL_DELETE_MEAL = "UPDATE meals SET deleted = TRUE WHERE id = ? AND deleted = FALSE RETURNING id"
+_SQL_LEADERBOARD = """
+    SELECT id, meal, cuisine, price, difficulty, battles, wins, ROUND(win_pct * 100, 1) AS win_pct
+    FROM meals WHERE deleted = FALSE AND battles > 0
+"""
+# Whitelisted ORDER BY clauses; sort_by is never interpolated into SQL itself.
+_SORT_COLUMNS = {
+    'wins': 'wins DESC',
+    # the stored column, not the rounded alias, so idx_leaderboard_win_pct applies
+    'win_pct': 'meals.win_pct DESC',
+}
+_SQL_LEADERBOARD_SORTED = {
+    sort_by: _SQL_LEADERBOARD + " ORDER BY " + order + " LIMIT ?" for sort_by, order in _SORT_COLUMNS.items()
+}
+# columns are selected in Meal's field order for Meal._from_row
+_SQL_GET_BY_ID = "SELECT id, meal, cuisine, price, difficulty FROM meals WHERE id = ? AND deleted = FALSE"
+_SQL_GET_BY_NAME = "SELECT id, meal, cuisine, price, difficulty FROM meals WHERE meal = ? AND deleted = FALSE"
+_SQL_GET_BY_IDS = "SELECT id, meal, cuisine, price, difficulty, deleted FROM meals WHERE id IN ({})"
+# ?1 is the wins to add, ?2 the meal id; SET expressions see the pre-update values
+_SQL_RECORD_RESULT = """
+    UPDATE meals SET battles = battles + 1, wins = wins + ?1, win_pct = (wins + ?1) * 1.0 / (battles + 1)
+    WHERE id = ?2 AND deleted = FALSE RETURNING id
+"""
+_SQL_UPDATE_STATS = """
+    UPDATE meals SET battles = battles + 1, wins = wins + ?1, win_pct = (wins + ?1) * 1.0 / (battles + 1)
+    WHERE id = ?2 AND deleted = FALSE
+"""
+
+# SQLITE_MAX_VARIABLE_NUMBER on builds older than 3.32
+_MAX_QUERY_PARAMS = 999
+
+_VALID_DIFFICULTY = frozenset({'LOW', 'MED', 'HIGH'})
+# battle result -> number of wins to add
+_RESULT_WINS = {'win': 1, 'loss': 0}
+
+# Live meals already read by get_meal_by_id/get_meal_by_name, keyed both ways.
+# The cache is per process: a delete made by another process is never seen.
+# delete_meal bumps the generation, and a lookup only stores its result if no
+# delete happened while it was reading, so a read that raced a delete cannot
+# put the deleted meal back. Hits move a meal to the end of _meals_by_id,
+# so a full cache evicts from the front, the least recently used.
+_MEAL_CACHE_SIZE = 1024
+_meal_cache_lock = threading.Lock()
+_meal_cache_generation = 0
+_meals_by_id = OrderedDict()
+_meals_by_name = {}
+
+
+# frozen so cached Meals can be shared safely; __slots__ is spelled out
+# because dataclass(slots=True) needs Python 3.10 and the image runs 3.9
+@dataclass(frozen=True)
 class Meal:
+    __slots__ = ('id', 'meal', 'cuisine', 'price', 'difficulty')
+
     id: int
     meal: str
     cuisine: str
@@ -22,30 +89,62 @@ class Meal:
     def __post_init__(self):
         if self.price < 0:
             raise ValueError("Price must be a positive value.")
-        if self.difficulty not in ['LOW', 'MED', 'HIGH']:
+        if self.difficulty not in _VALID_DIFFICULTY:
             raise ValueError("Difficulty must be 'LOW', 'MED', or 'HIGH'.")
 
+    @classmethod
+    def _from_row(cls, row) -> 'Meal':
+        # Stored rows already passed create_meal's checks, so fill the slots
+        # directly and skip __init__/__post_init__.
+        meal = object.__new__(cls)
+        for name, value in zip(cls.__slots__, row):
+            object.__setattr__(meal, name, value)
+        return meal
+
 
 def create_meal(meal: str, cuisine: str, price: float, difficulty: str) -> None:
     if not isinstance(price, (int, float)) or price <= 0:
         raise ValueError(f"Invalid price: {price}. Price must be a positive number.")
-    if difficulty not in ['LOW', 'MED', 'HIGH']:
+    if difficulty not in _VALID_DIFFICULTY:
         raise ValueError(f"Invalid difficulty level: {difficulty}. Must be 'LOW', 'MED', or 'HIGH'.")
 
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO meals (meal, cuisine, price, difficulty)
-                VALUES (?, ?, ?, ?)
-            """, (meal, cuisine, price, difficulty))
-            conn.commit()
+            cursor.execute(_SQL_INSERT_MEAL, (meal, cuisine, price, difficulty))
+            if cursor.fetchone() is None:
+                logger.error("Duplicate meal name: %s", meal)
+                raise ValueError(f"Meal with name '{meal}' already exists")
 
             logger.info("Meal successfully added to the database: %s", meal)
 
-    except sqlite3.IntegrityError:
-        logger.error("Duplicate meal name: %s", meal)
-        raise ValueError(f"Meal with name '{meal}' already exists")
+    except sqlite3.Error as e:
+        logger.error("Database error: %s", str(e))
+        raise e
+
+
+def create_meals(meals: Iterable[Tuple[str, str, float, str]]) -> None:
+    rows = list(meals)
+    for meal, cuisine, price, difficulty in rows:
+        if not isinstance(price, (int, float)) or price <= 0:
+            raise ValueError(f"Invalid price: {price}. Price must be a positive number.")
+        if difficulty not in _VALID_DIFFICULTY:
+            raise ValueError(f"Invalid difficulty level: {difficulty}. Must be 'LOW', 'MED', or 'HIGH'.")
+    if not rows:
+        return
+
+    try:
+        with get_db_connection() as conn:
+            # One transaction for the whole batch so SQLite syncs to disk once;
+            # get_db_connection rolls it back if anything below raises.
+            conn.execute("BEGIN")
+            # existing names are skipped instead of aborting the whole batch
+            cursor = conn.executemany(_SQL_INSERT_MEALS, rows)
+            conn.commit()
+
+            logger.info("%d meals successfully added to the database", cursor.rowcount)
+            if cursor.rowcount < len(rows):
+                logger.warning("Skipped %d duplicate meal names", len(rows) - cursor.rowcount)
 
     except sqlite3.Error as e:
         logger.error("Database error: %s", str(e))
@@ -56,18 +155,19 @@ def delete_meal(meal_id: int) -> None:
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT deleted FROM meals WHERE id = ?", (meal_id,))
-            try:
-                deleted = cursor.fetchone()[0]
-                if deleted:
+            # The update only matches live meals; a second lookup is needed
+            # only to tell "already deleted" apart from "not found".
+            cursor.execute(_SQL_DELETE_MEAL, (meal_id,))
+            if cursor.fetchone() is None:
+                cursor.execute(_SQL_MEAL_EXISTS, (meal_id,))
+                if cursor.fetchone():
                     logger.info("Meal with ID %s has already been deleted", meal_id)
                     raise ValueError(f"Meal with ID {meal_id} has been deleted")
-            except TypeError:
                 logger.info("Meal with ID %s not found", meal_id)
                 raise ValueError(f"Meal with ID {meal_id} not found")
 
-            cursor.execute("UPDATE meals SET deleted = TRUE WHERE id = ?", (meal_id,))
-            conn.commit()
+            # a deleted meal must stop resolving; lookups that raised were never cached
+            _evict_meal(meal_id)
 
             logger.info("Meal with ID %s marked as deleted.", meal_id)
 
@@ -75,62 +175,77 @@ def delete_meal(meal_id: int) -> None:
         logger.error("Database error: %s", str(e))
         raise e
 
-def get_leaderboard(sort_by: str="wins") -> dict[str, Any]:
-    query = """
-        SELECT id, meal, cuisine, price, difficulty, battles, wins, (wins * 1.0 / battles) AS win_pct
-        FROM meals WHERE deleted = false AND battles > 0
-    """
-
-    if sort_by == "win_pct":
-        query += " ORDER BY win_pct DESC"
-    elif sort_by == "wins":
-        query += " ORDER BY wins DESC"
-    else:
+def get_leaderboard(sort_by: str="wins", limit: Optional[int]=None) -> List[dict[str, Any]]:
+    query = _SQL_LEADERBOARD_SORTED.get(sort_by)
+    if query is None:
         logger.error("Invalid sort_by parameter: %s", sort_by)
         raise ValueError("Invalid sort_by parameter: %s" % sort_by)
+    if limit is not None and limit < 0:
+        logger.error("Invalid limit parameter: %s", limit)
+        raise ValueError("Invalid limit parameter: %s" % limit)
 
     try:
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(query)
-            rows = cursor.fetchall()
-
-        leaderboard = []
-        for row in rows:
-            meal = {
-                'id': row[0],
-                'meal': row[1],
-                'cuisine': row[2],
-                'price': row[3],
-                'difficulty': row[4],
-                'battles': row[5],
-                'wins': row[6],
-                'win_pct': round(row[7] * 100, 1)  # Convert to percentage
-            }
-            leaderboard.append(meal)
-
-        logger.info("Leaderboard retrieved successfully")
-        return leaderboard
+        # Reuse the shared read-only connection rather than opening one per
+        # refresh. The rows are read in full while the connection is held: a
+        # cursor left open on it would keep its read snapshot, so top N is
+        # cut off by LIMIT in SQL instead. LIMIT -1 means no limit in SQLite.
+        with get_readonly_connection() as conn:
+            rows = conn.execute(query, (-1 if limit is None else limit,)).fetchall()
 
     except sqlite3.Error as e:
         logger.error("Database error: %s", str(e))
         raise e
 
+    logger.info("Leaderboard retrieved successfully")
+    return [dict(row) for row in rows]
+
+
+def _cache_meal(meal: Meal, generation: int) -> None:
+    with _meal_cache_lock:
+        if generation != _meal_cache_generation:
+            return
+        if meal.id not in _meals_by_id and len(_meals_by_id) >= _MEAL_CACHE_SIZE:
+            # drop the least recently used entry
+            _, oldest = _meals_by_id.popitem(last=False)
+            _meals_by_name.pop(oldest.meal, None)
+        _meals_by_id[meal.id] = meal
+        _meals_by_id.move_to_end(meal.id)
+        _meals_by_name[meal.meal] = meal
+
+
+def _evict_meal(meal_id: int) -> None:
+    global _meal_cache_generation
+    with _meal_cache_lock:
+        _meal_cache_generation += 1
+        meal = _meals_by_id.pop(meal_id, None)
+        if meal is not None:
+            _meals_by_name.pop(meal.meal, None)
+
+
 def get_meal_by_id(meal_id: int) -> Meal:
+    with _meal_cache_lock:
+        meal = _meals_by_id.get(meal_id)
+        if meal is not None:
+            _meals_by_id.move_to_end(meal_id)
+            return meal
+        generation = _meal_cache_generation
+
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT id, meal, cuisine, price, difficulty, deleted FROM meals WHERE id = ?", (meal_id,))
+            cursor.execute(_SQL_GET_BY_ID, (meal_id,))
             row = cursor.fetchone()
-
             if row:
-                if row[5]:
-                    logger.info("Meal with ID %s has been deleted", meal_id)
-                    raise ValueError(f"Meal with ID {meal_id} has been deleted")
-                return Meal(id=row[0], meal=row[1], cuisine=row[2], price=row[3], difficulty=row[4])
-            else:
-                logger.info("Meal with ID %s not found", meal_id)
-                raise ValueError(f"Meal with ID {meal_id} not found")
+                meal = Meal._from_row(row)
+                _cache_meal(meal, generation)
+                return meal
+
+            cursor.execute(_SQL_MEAL_EXISTS, (meal_id,))
+            if cursor.fetchone():
+                logger.info("Meal with ID %s has been deleted", meal_id)
+                raise ValueError(f"Meal with ID {meal_id} has been deleted")
+            logger.info("Meal with ID %s not found", meal_id)
+            raise ValueError(f"Meal with ID {meal_id} not found")
 
     except sqlite3.Error as e:
         logger.error("Database error: %s", str(e))
@@ -138,47 +253,106 @@ def get_meal_by_id(meal_id: int) -> Meal:
 
 
 def get_meal_by_name(meal_name: str) -> Meal:
+    with _meal_cache_lock:
+        meal = _meals_by_name.get(meal_name)
+        if meal is not None:
+            _meals_by_id.move_to_end(meal.id)
+            return meal
+        generation = _meal_cache_generation
+
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT id, meal, cuisine, price, difficulty, deleted FROM meals WHERE meal = ?", (meal_name,))
+            cursor.execute(_SQL_GET_BY_NAME, (meal_name,))
             row = cursor.fetchone()
-
             if row:
-                if row[5]:
-                    logger.info("Meal with name %s has been deleted", meal_name)
-                    raise ValueError(f"Meal with name {meal_name} has been deleted")
-                return Meal(id=row[0], meal=row[1], cuisine=row[2], price=row[3], difficulty=row[4])
-            else:
-                logger.info("Meal with name %s not found", meal_name)
-                raise ValueError(f"Meal with name {meal_name} not found")
+                meal = Meal._from_row(row)
+                _cache_meal(meal, generation)
+                return meal
+
+            cursor.execute(_SQL_MEAL_NAME_EXISTS, (meal_name,))
+            if cursor.fetchone():
+                logger.info("Meal with name %s has been deleted", meal_name)
+                raise ValueError(f"Meal with name {meal_name} has been deleted")
+            logger.info("Meal with name %s not found", meal_name)
+            raise ValueError(f"Meal with name {meal_name} not found")
+
+    except sqlite3.Error as e:
+        logger.error("Database error: %s", str(e))
+        raise e
+
+
+def get_meals_by_ids(meal_ids: Iterable[int]) -> List[Meal]:
+    meal_ids = list(meal_ids)
+    unique_ids = list(dict.fromkeys(meal_ids))
+    rows = {}
+
+    try:
+        with get_db_connection() as conn:
+            # one IN (...) query per chunk instead of one query per meal
+            for start in range(0, len(unique_ids), _MAX_QUERY_PARAMS):
+                chunk = unique_ids[start:start + _MAX_QUERY_PARAMS]
+                query = _SQL_GET_BY_IDS.format(", ".join("?" * len(chunk)))
+                for row in conn.execute(query, chunk):
+                    rows[row[0]] = row
 
     except sqlite3.Error as e:
         logger.error("Database error: %s", str(e))
         raise e
 
+    meals = []
+    for meal_id in meal_ids:
+        row = rows.get(meal_id)
+        if row is None:
+            logger.info("Meal with ID %s not found", meal_id)
+            raise ValueError(f"Meal with ID {meal_id} not found")
+        if row[5]:
+            logger.info("Meal with ID %s has been deleted", meal_id)
+            raise ValueError(f"Meal with ID {meal_id} has been deleted")
+        meals.append(Meal._from_row(row))
+    return meals
+
 
 def update_meal_stats(meal_id: int, result: str) -> None:
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT deleted FROM meals WHERE id = ?", (meal_id,))
-            try:
-                deleted = cursor.fetchone()[0]
-                if deleted:
+            wins = _RESULT_WINS.get(result)
+            if wins is None:
+                raise ValueError(f"Invalid result: {result}. Expected 'win' or 'loss'.")
+            cursor.execute(_SQL_RECORD_RESULT, (wins, meal_id))
+
+            if cursor.fetchone() is None:
+                cursor.execute(_SQL_MEAL_EXISTS, (meal_id,))
+                if cursor.fetchone():
                     logger.info("Meal with ID %s has been deleted", meal_id)
                     raise ValueError(f"Meal with ID {meal_id} has been deleted")
-            except TypeError:
                 logger.info("Meal with ID %s not found", meal_id)
                 raise ValueError(f"Meal with ID {meal_id} not found")
 
-            if result == 'win':
-                cursor.execute("UPDATE meals SET battles = battles + 1, wins = wins + 1 WHERE id = ?", (meal_id,))
-            elif result == 'loss':
-                cursor.execute("UPDATE meals SET battles = battles + 1 WHERE id = ?", (meal_id,))
-            else:
-                raise ValueError(f"Invalid result: {result}. Expected 'win' or 'loss'.")
+    except sqlite3.Error as e:
+        logger.error("Database error: %s", str(e))
+        raise e
+
 
+def update_meal_stats_many(results: Iterable[Tuple[int, str]]) -> None:
+    rows = []
+    for meal_id, result in results:
+        wins = _RESULT_WINS.get(result)
+        if wins is None:
+            raise ValueError(f"Invalid result: {result}. Expected 'win' or 'loss'.")
+        rows.append((wins, meal_id))
+    if not rows:
+        return
+
+    try:
+        with get_db_connection() as conn:
+            # all or nothing, like create_meals: raising rolls back every update
+            conn.execute("BEGIN")
+            cursor = conn.executemany(_SQL_UPDATE_STATS, rows)
+            if cursor.rowcount != len(rows):
+                logger.info("Batch stats update referenced a missing or deleted meal")
+                raise ValueError("One or more meals in the batch were not found or have been deleted")
             conn.commit()
 
     except sqlite3.Error as e:
@@ -1,5 +1,10 @@
 import logging
+import os
+import random
+from typing import List
+
 import requests
+from requests.adapters import HTTPAdapter
 
 from meal_max.utils.logger import configure_logger
 
@@ -7,27 +12,60 @@ logger = logging.getLogger(__name__)
 configure_logger(logger)
 
 
-def get_random() -> float:
-    url = "https://www.random.org/decimal-fractions/?num=1&dec=2&col=1&format=plain&rnd=new"
+# set USE_LOCAL_RANDOM=true to draw from the OS entropy pool instead of random.org
+USE_LOCAL_RANDOM = os.getenv("USE_LOCAL_RANDOM", "false").lower() == "true"
+
+# Reuse one keep-alive connection to random.org instead of paying DNS,
+# TCP and TLS setup on every draw.
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+
+_LOCAL_RANDOM = random.SystemRandom()
+
+# most fractions random.org serves in a single request
+MAX_RANDOM_COUNT = 10000
+
+
+def get_random(use_local: bool = USE_LOCAL_RANDOM) -> float:
+    return get_random_many(1, use_local)[0]
+
+
+def get_random_many(count: int, use_local: bool = USE_LOCAL_RANDOM) -> List[float]:
+    if not 1 <= count <= MAX_RANDOM_COUNT:
+        raise ValueError(f"Invalid count: {count}. Must be between 1 and {MAX_RANDOM_COUNT}.")
+
+    if use_local:
+        # uniform over the same 0.00-0.99 grid random.org returns, without the network hop
+        random_numbers = [_LOCAL_RANDOM.randrange(100) / 100 for _ in range(count)]
+        logger.info("Generated local random numbers: %s", random_numbers)
+        return random_numbers
+
+    # random.org returns all the fractions in one response, one per line,
+    # so N draws cost a single round trip
+    url = f"https://www.random.org/decimal-fractions/?num={count}&dec=2&col=1&format=plain&rnd=new"
 
     try:
         # Log the request to random.org
-        logger.info("Fetching random number from %s", url)
+        logger.info("Fetching random numbers from %s", url)
 
-        response = requests.get(url, timeout=5)
+        response = _SESSION.get(url, timeout=5)
 
         # Check if the request was successful
         response.raise_for_status()
 
-        random_number_str = response.text.strip()
-
+        # float() accepts bytes, so parse the raw body and skip response.text's
+        # charset detection and decode; only the error path decodes
         try:
-            random_number = float(random_number_str)
+            random_numbers = [float(value) for value in response.content.split()]
         except ValueError:
-            raise ValueError("Invalid response from random.org: %s" % random_number_str)
+            random_numbers = []
+        if len(random_numbers) != count:
+            raise ValueError(
+                "Invalid response from random.org: %s" % response.content.strip().decode(errors="replace")
+            )
 
-        logger.info("Received random number: %.3f", random_number)
-        return random_number
+        logger.info("Received random numbers: %s", random_numbers)
+        return random_numbers
 
     except requests.exceptions.Timeout:
         logger.error("Request to random.org timed out.")
@@ -2,6 +2,8 @@ from contextlib import contextmanager
 import logging
 import os
 import sqlite3
+import threading
+from urllib.parse import quote
 
 from meal_max.utils.logger import configure_logger
 
@@ -13,6 +15,44 @@ configure_logger(logger)
 # load the db path from the environment with a default value
 DB_PATH = os.getenv("DB_PATH", "/app/sql/meal_max.db")
 
+# number of prepared statements sqlite3 keeps per connection (default is 128)
+CACHED_STATEMENTS = 256
+
+# cache tuning that also applies to read-only connections
+READ_PRAGMAS = (
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-65536",
+)
+
+# WAL lets readers run alongside the writer and, with synchronous=NORMAL,
+# costs one fsync of the log per commit instead of two of the main file.
+# journal_mode sticks to the database file; the rest are per connection.
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+) + READ_PRAGMAS
+
+# Leaderboard indexes from sql/create_meal_table.sql, repeated here so
+# migrate_meals_table can add them to databases created before they existed.
+LEADERBOARD_INDEXES = (
+    """CREATE INDEX IF NOT EXISTS idx_leaderboard_wins ON meals (wins DESC)
+        WHERE deleted = FALSE AND battles > 0""",
+    """CREATE INDEX IF NOT EXISTS idx_leaderboard_win_pct ON meals (win_pct DESC)
+        WHERE deleted = FALSE AND battles > 0""",
+)
+
+# One read-write connection per thread, opened on first use and then reused,
+# so statement caches and PRAGMA setup carry over between calls made on the
+# same thread: every call within one request, or every call on a long-lived
+# worker thread. The Flask dev server starts a new thread per request, so
+# there app.py closes the connection at teardown with close_db_connection().
+_local = threading.local()
+
+# shared read-only connection, opened on first use
+_readonly_conn = None
+_readonly_lock = threading.Lock()
+
 
 def check_database_connection():
     try:
@@ -37,6 +77,38 @@ def check_table_exists(tablename: str):
         logger.error(error_message)
         raise Exception(error_message) from e
 
+def migrate_meals_table():
+    # Upgrade a meals table created by an older create_meal_table.sql in
+    # place, keeping its data. Safe to run on every startup.
+    try:
+        # mode=rw so a missing database file is reported, not created empty
+        conn = sqlite3.connect(f"file:{quote(DB_PATH)}?mode=rw", uri=True, isolation_level=None)
+    except sqlite3.OperationalError as e:
+        logger.warning("Skipping meals migration, database unavailable: %s", str(e))
+        return
+
+    try:
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(meals)")}
+        if not columns:
+            logger.warning("Skipping meals migration, meals table does not exist")
+            return
+
+        conn.execute("BEGIN")
+        if "win_pct" not in columns:
+            logger.info("Adding win_pct column to meals")
+            conn.execute("ALTER TABLE meals ADD COLUMN win_pct REAL DEFAULT 0")
+            conn.execute("UPDATE meals SET win_pct = wins * 1.0 / battles WHERE battles > 0")
+        for index in LEADERBOARD_INDEXES:
+            conn.execute(index)
+        conn.execute("COMMIT")
+    except sqlite3.Error as e:
+        if conn.in_transaction:
+            conn.rollback()
+        logger.error("Meals migration error: %s", str(e))
+        raise e
+    finally:
+        conn.close()
+
 ###################################################
 #
 # This one yields rather than returns.
@@ -45,14 +117,63 @@ def check_table_exists(tablename: str):
 ###################################################
 @contextmanager
 def get_db_connection():
-    conn = None
+    conn = getattr(_local, "conn", None)
     try:
-        conn = sqlite3.connect(DB_PATH)
+        if conn is None:
+            # Autocommit: single statements commit on their own and batched
+            # writers wrap themselves in an explicit BEGIN ... COMMIT.
+            conn = sqlite3.connect(
+                DB_PATH,
+                isolation_level=None,
+                check_same_thread=False,
+                cached_statements=CACHED_STATEMENTS
+            )
+            # rows support both positional and by-name access, and dict(row)
+            conn.row_factory = sqlite3.Row
+            for pragma in CONNECTION_PRAGMAS:
+                conn.execute(pragma)
+            _local.conn = conn
         yield conn
-    except sqlite3.Error as e:
-        logger.error("Database connection error: %s", str(e))
-        raise e
-    finally:
-        if conn:
-            conn.close()
-            logger.info("Database connection closed.")
+    except Exception as e:
+        # never leave a half-finished transaction on the reused connection
+        if conn is not None and conn.in_transaction:
+            conn.rollback()
+        if isinstance(e, sqlite3.Error):
+            logger.error("Database connection error: %s", str(e))
+        raise
+
+
+def close_db_connection():
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        _local.conn = None
+        conn.close()
+        logger.info("Database connection closed.")
+
+
+@contextmanager
+def get_readonly_connection():
+    global _readonly_conn
+    with _readonly_lock:
+        try:
+            if _readonly_conn is None:
+                conn = sqlite3.connect(
+                    f"file:{quote(DB_PATH)}?mode=ro",
+                    uri=True,
+                    check_same_thread=False,
+                    cached_statements=CACHED_STATEMENTS
+                )
+                conn.row_factory = sqlite3.Row
+                for pragma in READ_PRAGMAS:
+                    conn.execute(pragma)
+                _readonly_conn = conn
+            yield _readonly_conn
+        except sqlite3.Error as e:
+            logger.error("Database connection error: %s", str(e))
+            # Drop the shared connection so the next caller reopens it. Callers
+            # finish with their cursors inside this block, so nothing else is
+            # left reading from it.
+            if _readonly_conn is not None:
+                _readonly_conn.close()
+                _readonly_conn = None
+            raise e
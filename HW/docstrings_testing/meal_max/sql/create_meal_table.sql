@@ -7,5 +7,17 @@ CREATE TABLE meals (
     difficulty TEXT CHECK(difficulty IN ('HIGH', 'MED', 'LOW')),
     battles INTEGER DEFAULT 0,
     wins INTEGER DEFAULT 0,
+    -- wins / battles, kept up to date by update_meal_stats so the leaderboard
+    -- can sort on an indexed column instead of dividing every row
+    win_pct REAL DEFAULT 0,
     deleted BOOLEAN DEFAULT FALSE
-);
\ No newline at end of file
+);
+
+-- Partial indexes that hand get_leaderboard its rows already filtered and
+-- sorted. The planner only matches a partial index when the query's WHERE
+-- terms are written identically, so keep these in sync with kitchen_model
+-- and with LEADERBOARD_INDEXES in sql_utils (used to migrate older databases).
+CREATE INDEX idx_leaderboard_wins ON meals (wins DESC)
+    WHERE deleted = FALSE AND battles > 0;
+CREATE INDEX idx_leaderboard_win_pct ON meals (win_pct DESC)
+    WHERE deleted = FALSE AND battles > 0;
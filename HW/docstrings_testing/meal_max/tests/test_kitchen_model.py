@@ -0,0 +1,226 @@
+from collections import OrderedDict
+import sqlite3
+
+import pytest
+
+from meal_max.models import kitchen_model
+from meal_max.models.kitchen_model import (
+    create_meals,
+    delete_meal,
+    get_leaderboard,
+    get_meal_by_id,
+    get_meal_by_name,
+    get_meals_by_ids,
+    update_meal_stats_many
+)
+from meal_max.utils import sql_utils
+
+
+######################################################
+#
+#    Fixtures
+#
+######################################################
+
+@pytest.fixture
+def meals_db(tmp_path, monkeypatch):
+    """A file database built from the real schema, with the module caches reset around each test."""
+    db_path = tmp_path / "meal_max.db"
+    conn = sqlite3.connect(db_path)
+    with open("sql/create_meal_table.sql") as schema:
+        conn.executescript(schema.read())
+    conn.close()
+
+    monkeypatch.setattr(sql_utils, "DB_PATH", str(db_path))
+    monkeypatch.setattr(sql_utils, "_readonly_conn", None)
+    monkeypatch.setattr(kitchen_model, "_meals_by_id", OrderedDict())
+    monkeypatch.setattr(kitchen_model, "_meals_by_name", {})
+
+    yield db_path
+
+    sql_utils.close_db_connection()
+    if sql_utils._readonly_conn is not None:
+        sql_utils._readonly_conn.close()
+
+######################################################
+#
+#    Batch writes
+#
+######################################################
+
+def test_create_meals_skips_duplicates(meals_db, caplog):
+    """Test that duplicate names within a batch and against existing meals are skipped and counted."""
+    create_meals([("Pasta", "Italian", 10.0, "LOW")])
+
+    create_meals([
+        ("Sushi", "Japanese", 15.0, "HIGH"),
+        ("Pasta", "Italian", 12.0, "MED"),
+        ("Sushi", "Japanese", 16.0, "HIGH"),
+        ("Tacos", "Mexican", 8.0, "MED"),
+    ])
+
+    assert get_meal_by_name("Pasta").price == 10.0, "Expected the existing Pasta to be kept"
+    assert get_meal_by_name("Sushi").price == 15.0, "Expected the first Sushi in the batch to be kept"
+    assert [meal.meal for meal in get_meals_by_ids([2, 3])] == ["Sushi", "Tacos"], "Expected skipped names not to consume ids"
+    assert "2 meals successfully added to the database" in caplog.text
+    assert "Skipped 2 duplicate meal names" in caplog.text
+
+@pytest.mark.parametrize("bad_id", [99, 2])
+def test_update_meal_stats_many_rolls_back(meals_db, bad_id):
+    """Test that a missing or deleted meal in the batch rolls back every update in it."""
+    create_meals([("Pasta", "Italian", 10.0, "LOW"), ("Sushi", "Japanese", 15.0, "HIGH")])
+    delete_meal(2)
+
+    with pytest.raises(ValueError, match="One or more meals in the batch were not found or have been deleted"):
+        update_meal_stats_many([(1, "win"), (bad_id, "loss"), (1, "win")])
+
+    conn = sqlite3.connect(meals_db)
+    stats = conn.execute("SELECT battles, wins FROM meals WHERE id = 1").fetchone()
+    conn.close()
+    assert stats == (0, 0), f"Expected no stats to be recorded, got {stats}"
+
+    update_meal_stats_many([(1, "win")])
+    assert get_leaderboard()[0]["wins"] == 1, "Expected the connection to be usable after the rollback"
+
+def test_batch_writes_empty_input(mocker):
+    """Test that empty batches return without opening a connection."""
+    mock_get_db_connection = mocker.patch("meal_max.models.kitchen_model.get_db_connection")
+
+    create_meals([])
+    update_meal_stats_many(iter(()))
+
+    mock_get_db_connection.assert_not_called()
+
+######################################################
+#
+#    Leaderboard
+#
+######################################################
+
+def test_get_leaderboard(meals_db):
+    """Test that the leaderboard is a list of dicts in sort order, without unbattled or deleted meals."""
+    create_meals([
+        ("Pasta", "Italian", 10.0, "LOW"),
+        ("Sushi", "Japanese", 15.0, "HIGH"),
+        ("Tacos", "Mexican", 8.0, "MED"),
+        ("Soup", "French", 6.0, "LOW"),
+    ])
+    update_meal_stats_many([(1, "win"), (1, "win"), (1, "loss"), (2, "win"), (4, "win")])
+    delete_meal(4)
+
+    leaderboard = get_leaderboard("wins")
+
+    assert isinstance(leaderboard, list), "Expected the leaderboard to be a list"
+    assert [row["meal"] for row in leaderboard] == ["Pasta", "Sushi"], f"Unexpected leaderboard order: {leaderboard}"
+    assert leaderboard[0] == {
+        "id": 1, "meal": "Pasta", "cuisine": "Italian", "price": 10.0, "difficulty": "LOW",
+        "battles": 3, "wins": 2, "win_pct": 66.7
+    }, f"Unexpected leaderboard row: {leaderboard[0]}"
+
+    assert [row["meal"] for row in get_leaderboard("win_pct")] == ["Sushi", "Pasta"]
+    assert [row["meal"] for row in get_leaderboard("wins", limit=1)] == ["Pasta"]
+    assert get_leaderboard("wins", limit=0) == []
+
+def test_get_leaderboard_invalid_arguments(meals_db):
+    """Test that only whitelisted sort orders and non-negative limits are accepted."""
+    with pytest.raises(ValueError, match="Invalid sort_by parameter: battles; DROP TABLE meals"):
+        get_leaderboard("battles; DROP TABLE meals")
+
+    with pytest.raises(ValueError, match="Invalid limit parameter: -1"):
+        get_leaderboard("wins", limit=-1)
+
+######################################################
+#
+#    Meal lookup cache
+#
+######################################################
+
+def test_get_meal_cache_hit_skips_database(meals_db, mocker):
+    """Test that a meal read once is served from the cache by id and by name."""
+    create_meals([("Pasta", "Italian", 10.0, "LOW")])
+    meal = get_meal_by_id(1)
+
+    mock_get_db_connection = mocker.patch("meal_max.models.kitchen_model.get_db_connection")
+
+    assert get_meal_by_id(1) is meal, "Expected the cached Meal to be returned by id"
+    assert get_meal_by_name("Pasta") is meal, "Expected the cached Meal to be returned by name"
+    mock_get_db_connection.assert_not_called()
+
+def test_delete_meal_evicts_cache(meals_db):
+    """Test that deleting a cached meal stops it resolving by id and by name."""
+    create_meals([("Pasta", "Italian", 10.0, "LOW")])
+    get_meal_by_id(1)
+
+    delete_meal(1)
+
+    assert 1 not in kitchen_model._meals_by_id, "Expected the deleted meal to be evicted by id"
+    assert "Pasta" not in kitchen_model._meals_by_name, "Expected the deleted meal to be evicted by name"
+    with pytest.raises(ValueError, match="Meal with ID 1 has been deleted"):
+        get_meal_by_id(1)
+    with pytest.raises(ValueError, match="Meal with name Pasta has been deleted"):
+        get_meal_by_name("Pasta")
+
+def test_get_meal_racing_delete_is_not_cached(meals_db, mocker):
+    """Test that a lookup which read a meal before it was deleted does not cache it afterwards."""
+    create_meals([("Pasta", "Italian", 10.0, "LOW")])
+    from_row = kitchen_model.Meal._from_row
+
+    def read_then_delete(row):
+        # the row has been read; the delete lands before the lookup caches it
+        meal = from_row(row)
+        delete_meal(meal.id)
+        return meal
+
+    mocker.patch.object(kitchen_model.Meal, "_from_row", side_effect=read_then_delete)
+    get_meal_by_id(1)
+
+    assert 1 not in kitchen_model._meals_by_id, "Expected the racing lookup not to cache the deleted meal"
+    assert "Pasta" not in kitchen_model._meals_by_name, "Expected the racing lookup not to cache the deleted meal"
+
+def test_meal_cache_evicts_least_recently_used(meals_db, monkeypatch):
+    """Test that a full cache evicts the least recently used meal, counting hits as uses."""
+    monkeypatch.setattr(kitchen_model, "_MEAL_CACHE_SIZE", 2)
+    create_meals([
+        ("Pasta", "Italian", 10.0, "LOW"),
+        ("Sushi", "Japanese", 15.0, "HIGH"),
+        ("Tacos", "Mexican", 8.0, "MED"),
+    ])
+    get_meal_by_id(1)
+    get_meal_by_id(2)
+    get_meal_by_name("Pasta")  # a hit makes Pasta the most recently used
+
+    get_meal_by_id(3)
+
+    assert list(kitchen_model._meals_by_id) == [1, 3], f"Expected Sushi to be evicted, cache holds {list(kitchen_model._meals_by_id)}"
+    assert set(kitchen_model._meals_by_name) == {"Pasta", "Tacos"}, "Expected the name index to follow the id cache"
+
+######################################################
+#
+#    Bulk lookup
+#
+######################################################
+
+def test_get_meals_by_ids(meals_db):
+    """Test that meals come back in request order, once per requested id, across several IN chunks."""
+    count = kitchen_model._MAX_QUERY_PARAMS + 50
+    create_meals((f"Meal {i}", "Cuisine", 10.0, "LOW") for i in range(1, count + 1))
+    meal_ids = list(range(count, 0, -1)) + [1, count]
+
+    meals = get_meals_by_ids(meal_ids)
+
+    assert [meal.id for meal in meals] == meal_ids, "Expected meals in the order requested, duplicates included"
+    assert meals[0].meal == f"Meal {count}"
+    assert meals[-1] == meals[0], "Expected a duplicate id to return the same meal again"
+
+def test_get_meals_by_ids_missing_or_deleted(meals_db):
+    """Test that a missing or deleted id fails the whole lookup."""
+    create_meals([("Pasta", "Italian", 10.0, "LOW"), ("Sushi", "Japanese", 15.0, "HIGH")])
+    delete_meal(2)
+
+    with pytest.raises(ValueError, match="Meal with ID 99 not found"):
+        get_meals_by_ids([1, 99])
+
+    with pytest.raises(ValueError, match="Meal with ID 2 has been deleted"):
+        get_meals_by_ids([1, 2])
+
+    assert get_meals_by_ids([]) == []
@@ -0,0 +1,51 @@
+import sqlite3
+
+import pytest
+
+from meal_max.models.kitchen_model import _SQL_LEADERBOARD_SORTED
+
+
+######################################################
+#
+#    Fixtures
+#
+######################################################
+
+@pytest.fixture
+def seeded_conn():
+    """An in-memory meals table built from the real schema and seeded with battle stats."""
+    conn = sqlite3.connect(":memory:")
+    with open("sql/create_meal_table.sql") as schema:
+        conn.executescript(schema.read())
+
+    rows = []
+    for i in range(500):
+        battles = i % 20
+        wins = battles // 2
+        rows.append((f"Meal {i}", "Cuisine", 10.0, "LOW", battles, wins, wins / battles if battles else 0, i % 10 == 0))
+    conn.executemany("""
+        INSERT INTO meals (meal, cuisine, price, difficulty, battles, wins, win_pct, deleted)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """, rows)
+
+    yield conn
+    conn.close()
+
+######################################################
+#
+#    Query plans
+#
+######################################################
+
+@pytest.mark.parametrize("sort_by, index", [
+    ("wins", "idx_leaderboard_wins"),
+    ("win_pct", "idx_leaderboard_win_pct"),
+])
+def test_leaderboard_uses_partial_index(seeded_conn, sort_by, index):
+    """Test that each leaderboard sort is served by its partial index instead of a scan and sort."""
+    query = _SQL_LEADERBOARD_SORTED[sort_by]
+
+    plan = " ".join(row[3] for row in seeded_conn.execute("EXPLAIN QUERY PLAN " + query, (-1,)))
+
+    assert f"USING INDEX {index}" in plan, f"Expected the {sort_by} leaderboard to use {index}, got plan: {plan}"
+    assert "TEMP B-TREE" not in plan, f"Expected no separate sort step, got plan: {plan}"
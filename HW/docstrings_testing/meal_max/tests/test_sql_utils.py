@@ -0,0 +1,84 @@
+import sqlite3
+
+import pytest
+
+from meal_max.utils import sql_utils
+from meal_max.utils.sql_utils import migrate_meals_table
+
+
+######################################################
+#
+#    Fixtures
+#
+######################################################
+
+@pytest.fixture
+def old_meals_db(tmp_path, monkeypatch):
+    """A database with the meals table as created before win_pct and the leaderboard indexes existed."""
+    db_path = tmp_path / "meal_max.db"
+    conn = sqlite3.connect(db_path)
+    conn.execute("""
+        CREATE TABLE meals (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            meal TEXT NOT NULL UNIQUE,
+            cuisine TEXT NOT NULL,
+            price REAL NOT NULL,
+            difficulty TEXT CHECK(difficulty IN ('HIGH', 'MED', 'LOW')),
+            battles INTEGER DEFAULT 0,
+            wins INTEGER DEFAULT 0,
+            deleted BOOLEAN DEFAULT FALSE
+        )
+    """)
+    conn.executemany("""
+        INSERT INTO meals (meal, cuisine, price, difficulty, battles, wins)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, [
+        ("Pasta", "Italian", 10.0, "LOW", 4, 3),
+        ("Sushi", "Japanese", 15.0, "HIGH", 0, 0),
+    ])
+    conn.commit()
+    conn.close()
+
+    monkeypatch.setattr(sql_utils, "DB_PATH", str(db_path))
+    return db_path
+
+######################################################
+#
+#    Migration
+#
+######################################################
+
+def test_migrate_meals_table(old_meals_db):
+    """Test that the migration adds and backfills win_pct and the indexes, and can run again safely."""
+    migrate_meals_table()
+    migrate_meals_table()
+
+    conn = sqlite3.connect(old_meals_db)
+    win_pct = dict(conn.execute("SELECT meal, win_pct FROM meals"))
+    indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    conn.close()
+
+    assert win_pct == {"Pasta": 0.75, "Sushi": 0}, f"Expected win_pct to be backfilled from wins / battles, got {win_pct}"
+    assert {"idx_leaderboard_wins", "idx_leaderboard_win_pct"} <= indexes, f"Expected both leaderboard indexes, got {indexes}"
+
+def test_migrate_meals_table_missing_database(tmp_path, monkeypatch):
+    """Test that a missing database file is skipped rather than created."""
+    db_path = tmp_path / "missing.db"
+    monkeypatch.setattr(sql_utils, "DB_PATH", str(db_path))
+
+    migrate_meals_table()
+
+    assert not db_path.exists(), "Expected the migration not to create a database file"
+
+def test_migrate_meals_table_missing_table(tmp_path, monkeypatch):
+    """Test that a database without a meals table is left alone."""
+    db_path = tmp_path / "empty.db"
+    sqlite3.connect(db_path).close()
+    monkeypatch.setattr(sql_utils, "DB_PATH", str(db_path))
+
+    migrate_meals_table()
+
+    conn = sqlite3.connect(db_path)
+    tables = conn.execute("SELECT name FROM sqlite_master").fetchall()
+    conn.close()
+    assert tables == [], f"Expected the migration to create nothing, got {tables}"
@@ -1,5 +1,4 @@
 from contextlib import contextmanager
-import re
 import sqlite3
 
 import pytest
@@ -22,7 +21,7 @@ from music_collection.models.song_model import (
 ######################################################
 
 def normalize_whitespace(sql_query: str) -> str:
-    return re.sub(r'\s+', ' ', sql_query).strip()
+    return ' '.join(sql_query.split())
 
 # Mocking the database connection for tests
 @pytest.fixture